@@ -15,6 +15,12 @@ class Settings:
     app_name: str = os.getenv("APP_NAME", "Real Estate Content Generator")
     app_version: str = os.getenv("APP_VERSION", "1.0.0")
     debug: bool = os.getenv("DEBUG", "False").lower() == "true"
+    
+    # Tracing & Profiling
+    trace_export_path: str = os.getenv("TRACE_EXPORT_PATH", "")
+    trace_export_format: str = os.getenv("TRACE_EXPORT_FORMAT", "json").lower()
+    admin_token: str = os.getenv("ADMIN_TOKEN", "")
+    profiler_max_seconds: int = int(os.getenv("PROFILER_MAX_SECONDS", "60"))
 
 # Global settings instance
 settings = Settings()
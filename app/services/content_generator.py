@@ -6,6 +6,7 @@ import re
 
 from app.models import PropertyData, GeneratedContent, ContentSection
 from app.config import settings, CONTENT_LIMITS, SEO_KEYWORDS
+from app.utils.tracing import span
 from templates.prompts.english_prompts import ENGLISH_PROMPTS
 from templates.prompts.portuguese_prompts import PORTUGUESE_PROMPTS
 
@@ -114,7 +115,8 @@ class ContentGenerator:
 
 IMPORTANT: Generate ONLY the requested HTML tag with content, no additional text or explanations."""
 
-            response = await self.model.generate_content_async(enhanced_prompt)
+            with span("gemini.generate", model=settings.gemini_model, prompt_chars=len(enhanced_prompt)):
+                response = await self.model.generate_content_async(enhanced_prompt)
             
             if not response.text:
                 raise ValueError("Empty response from Gemini Flash API")
@@ -138,18 +140,21 @@ IMPORTANT: Generate ONLY the requested HTML tag with content, no additional text
         if section_name not in self.prompts[lang]:
             raise ValueError(f"Unknown section: {section_name}")
         
-        context = self._build_property_context(property_data)
-        keywords = self._get_seo_keywords(property_data)
-        context["seo_keywords"] = ", ".join(keywords[:5])  # Limit keywords
-        
-        # Build prompt
-        prompt_template = self.prompts[lang][section_name]
-        prompt = prompt_template.format(**context)
-        
-        logger.info(f"Generating {section_name} for {property_data.title}")
-        
-        # Generate content
-        content = await self._generate_with_gemini(prompt)
+        with span("generate_section", section=section_name, language=lang):
+            with span("build_property_context"):
+                context = self._build_property_context(property_data)
+                keywords = self._get_seo_keywords(property_data)
+                context["seo_keywords"] = ", ".join(keywords[:5])  # Limit keywords
+            
+            # Build prompt
+            with span("format_prompt"):
+                prompt_template = self.prompts[lang][section_name]
+                prompt = prompt_template.format(**context)
+            
+            logger.info(f"Generating {section_name} for {property_data.title}")
+            
+            # Generate content
+            content = await self._generate_with_gemini(prompt)
         
         return content
     
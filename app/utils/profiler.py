@@ -0,0 +1,60 @@
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict
+
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a profiling session is already running"""
+
+
+class SamplingProfiler:
+    """Stack-sampling profiler that reports folded stacks for flamegraph tools"""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self._lock = threading.Lock()
+
+    def _fold(self, frame) -> str:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ";".join(reversed(stack))
+
+    def sample(self, seconds: float) -> Dict:
+        """Sample every other thread for ``seconds`` and return folded stacks"""
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("A profiling session is already running")
+
+        try:
+            own_thread = threading.get_ident()
+            thread_names = {t.ident: t.name for t in threading.enumerate()}
+            stacks: Counter = Counter()
+            samples = 0
+            deadline = time.monotonic() + seconds
+
+            while time.monotonic() < deadline:
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_thread:
+                        continue
+                    thread_name = thread_names.get(thread_id, f"thread-{thread_id}")
+                    stacks[f"{thread_name};{self._fold(frame)}"] += 1
+                samples += 1
+                time.sleep(self.interval)
+
+            return {"samples": samples, "interval": self.interval, "stacks": stacks}
+        finally:
+            self._lock.release()
+
+    @staticmethod
+    def to_collapsed(result: Dict) -> str:
+        """Render result in Brendan Gregg's collapsed format (flamegraph.pl, speedscope)"""
+        return "\n".join(
+            f"{stack} {count}" for stack, count in result["stacks"].most_common()
+        ) + "\n"
+
+
+profiler = SamplingProfiler()
@@ -0,0 +1,239 @@
+import json
+import logging
+import queue
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+REQUEST_ID_HEADER = "X-Request-ID"
+REQUEST_ID_PATTERN = re.compile(r"[A-Za-z0-9._-]{1,128}")
+
+# OTLP span kinds
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("current_trace", default=None)
+_current_span_id: ContextVar[Optional[str]] = ContextVar("current_span_id", default=None)
+
+_export_queue: "queue.Queue[tuple]" = queue.Queue()
+_export_thread: Optional[threading.Thread] = None
+_export_thread_lock = threading.Lock()
+
+
+class Span:
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str],
+        attributes: Dict,
+        kind: int = SPAN_KIND_INTERNAL
+    ):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+        # Wall-clock timestamps can jump (NTP), so durations use a monotonic clock
+        self._start_perf_ns = time.perf_counter_ns()
+        self._end_perf_ns: Optional[int] = None
+
+    def finish(self):
+        self._end_perf_ns = time.perf_counter_ns()
+        self.end_ns = self.start_ns + (self._end_perf_ns - self._start_perf_ns)
+
+    @property
+    def duration_ms(self) -> float:
+        end_perf_ns = self._end_perf_ns if self._end_perf_ns is not None else time.perf_counter_ns()
+        return (end_perf_ns - self._start_perf_ns) / 1_000_000
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+def _otlp_value(value) -> Dict:
+    """Wrap attribute value in the matching OTLP ``AnyValue`` field"""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        # int64 values are string-encoded in OTLP/JSON
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Trace:
+    def __init__(self, request_id: Optional[str] = None):
+        self.trace_id = uuid.uuid4().hex
+        self.request_id = request_id or self.trace_id
+        self.spans: List[Span] = []
+
+    def to_dict(self) -> Dict:
+        return {
+            "trace_id": self.trace_id,
+            "request_id": self.request_id,
+            "spans": [span.to_dict() for span in self.spans],
+        }
+
+    def to_otlp(self) -> Dict:
+        """Convert trace to the OTLP/JSON ``ExportTraceServiceRequest`` layout"""
+        otlp_spans = []
+        for span in self.spans:
+            attributes = {"request.id": self.request_id, **span.attributes}
+            otlp_span = {
+                "traceId": self.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                "kind": span.kind,
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns or span.start_ns),
+                "attributes": [
+                    {"key": key, "value": _otlp_value(value)}
+                    for key, value in attributes.items()
+                ],
+                "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+            }
+            if span.parent_id:
+                otlp_span["parentSpanId"] = span.parent_id
+            otlp_spans.append(otlp_span)
+
+        return {
+            "resourceSpans": [{
+                "resource": {
+                    "attributes": [
+                        {"key": "service.name", "value": {"stringValue": settings.app_name}},
+                        {"key": "service.version", "value": {"stringValue": settings.app_version}},
+                    ]
+                },
+                "scopeSpans": [{
+                    "scope": {"name": __name__},
+                    "spans": otlp_spans,
+                }],
+            }]
+        }
+
+
+def valid_request_id(value: Optional[str]) -> Optional[str]:
+    """Return client-supplied request id if it is safe to echo and export"""
+    if value and REQUEST_ID_PATTERN.fullmatch(value):
+        return value
+    return None
+
+
+def current_trace() -> Optional[Trace]:
+    """Return the trace bound to the current request, if any"""
+    return _current_trace.get()
+
+
+@contextmanager
+def start_trace(request_id: Optional[str] = None):
+    """Bind a new trace to the current context and export it when done"""
+    trace = Trace(request_id)
+    trace_token = _current_trace.set(trace)
+    span_token = _current_span_id.set(None)
+    try:
+        yield trace
+    finally:
+        _current_span_id.reset(span_token)
+        _current_trace.reset(trace_token)
+        export_trace(trace)
+
+
+@contextmanager
+def span(name: str, kind: int = SPAN_KIND_INTERNAL, **attributes):
+    """Record a named span under the current trace (no-op outside a trace)"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+
+    current = Span(name, trace.trace_id, _current_span_id.get(), attributes, kind)
+    trace.spans.append(current)
+    token = _current_span_id.set(current.span_id)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.finish()
+        _current_span_id.reset(token)
+
+
+def _write_traces(batch: List[tuple]):
+    """Append a batch of traces to their export files, one JSON line each"""
+    by_path: Dict[str, List[str]] = {}
+    for trace, path, export_format in batch:
+        payload = trace.to_otlp() if export_format == "otlp" else trace.to_dict()
+        by_path.setdefault(path, []).append(json.dumps(payload) + "\n")
+
+    for path, lines in by_path.items():
+        try:
+            with open(path, "a", encoding="utf-8") as f:
+                f.writelines(lines)
+        except OSError as e:
+            logger.error(f"Failed to export {len(lines)} trace(s) to {path}: {e}")
+
+
+def _export_worker():
+    """Drain the export queue so file I/O never runs on the event loop"""
+    while True:
+        batch = [_export_queue.get()]
+        while True:
+            try:
+                batch.append(_export_queue.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            _write_traces(batch)
+        except Exception as e:
+            logger.error(f"Trace export failed: {e}")
+        finally:
+            for _ in batch:
+                _export_queue.task_done()
+
+
+def _ensure_export_thread():
+    global _export_thread
+    with _export_thread_lock:
+        if _export_thread is None or not _export_thread.is_alive():
+            _export_thread = threading.Thread(
+                target=_export_worker, name="trace-exporter", daemon=True
+            )
+            _export_thread.start()
+
+
+def export_trace(trace: Trace):
+    """Queue finished trace for the background writer"""
+    if not settings.trace_export_path:
+        return
+
+    _ensure_export_thread()
+    _export_queue.put((trace, settings.trace_export_path, settings.trace_export_format))
+
+
+def flush_exports():
+    """Block until every queued trace has been written"""
+    _export_queue.join()
@@ -1,12 +1,18 @@
-from fastapi import FastAPI, HTTPException, status
+from fastapi import FastAPI, HTTPException, Header, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
+import asyncio
+import hmac
 import logging
 from typing import Optional
 
 from app.models import PropertyData, GeneratedContent, APIResponse
 from app.services.content_generator import ContentGenerator
 from app.config import settings
+from app.utils.profiler import profiler, ProfilerBusyError
+from app.utils.tracing import (
+    REQUEST_ID_HEADER, SPAN_KIND_SERVER, flush_exports, span, start_trace, valid_request_id
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -28,8 +34,28 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST"],
     allow_headers=["*"],
+    expose_headers=[REQUEST_ID_HEADER],
 )
 
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """Trace each request and propagate its id via the X-Request-ID header"""
+    # Ids that are too long or contain unexpected characters are replaced
+    request_id = valid_request_id(request.headers.get(REQUEST_ID_HEADER))
+    with start_trace(request_id) as trace:
+        # Time in this span not covered by a child span is spent outside the
+        # handler: body parsing, pydantic validation and response serialization
+        with span(
+            "http.request",
+            kind=SPAN_KIND_SERVER,
+            method=request.method,
+            path=request.url.path
+        ) as root:
+            response = await call_next(request)
+            root.attributes["status_code"] = response.status_code
+        response.headers[REQUEST_ID_HEADER] = trace.request_id
+        return response
+
 # Initialize content generator
 content_generator = ContentGenerator()
 
@@ -43,6 +69,11 @@ async def startup_event():
     except Exception as e:
         logger.error(f" Failed to initialize content generator: {e}")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Write out any traces still queued for export"""
+    await asyncio.to_thread(flush_exports)
+
 @app.get("/")
 async def root():
     """Health check endpoint"""
@@ -78,7 +109,8 @@ async def generate_content(property_data: PropertyData):
         logger.info(f"Generating content for property: {property_data.title}")
         
         # Generate content using AI service
-        generated_content = await content_generator.generate_all_sections(property_data)
+        with span("handler.generate_content"):
+            generated_content = await content_generator.generate_all_sections(property_data)
         
         return APIResponse(
             success=True,
@@ -121,7 +153,8 @@ async def generate_single_section(
         if section_name not in valid_sections:
             raise ValueError(f"Invalid section name. Must be one of: {valid_sections}")
         
-        content = await content_generator.generate_section(property_data, section_name)
+        with span("handler.generate_section"):
+            content = await content_generator.generate_section(property_data, section_name)
         
         return APIResponse(
             success=True,
@@ -136,6 +169,43 @@ async def generate_single_section(
             detail=f"Failed to generate section: {str(e)}"
         )
 
+@app.post("/admin/profile", response_class=PlainTextResponse)
+async def profile_server(
+    seconds: float = 10,
+    x_admin_token: Optional[str] = Header(default=None)
+):
+    """
+    Run the sampling profiler against the live server
+    
+    Args:
+        seconds: How long to sample for (capped by PROFILER_MAX_SECONDS)
+        
+    Returns:
+        Folded stacks, ready for flamegraph.pl or speedscope
+    """
+    if not settings.admin_token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    
+    if not x_admin_token or not hmac.compare_digest(
+        x_admin_token.encode(), settings.admin_token.encode()
+    ):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid admin token")
+    
+    if not 0 < seconds <= settings.profiler_max_seconds:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"seconds must be between 0 and {settings.profiler_max_seconds}"
+        )
+    
+    try:
+        # Sample from a worker thread so the event loop keeps serving traffic
+        result = await asyncio.to_thread(profiler.sample, seconds)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    
+    logger.info(f"Profiled server for {seconds}s ({result['samples']} samples)")
+    return PlainTextResponse(profiler.to_collapsed(result))
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """Global exception handler"""
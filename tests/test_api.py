@@ -0,0 +1,92 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.utils.profiler import profiler
+from app.utils.tracing import REQUEST_ID_HEADER
+from main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def admin_token(monkeypatch):
+    monkeypatch.setattr(settings, "admin_token", "secret-token")
+    return "secret-token"
+
+
+def test_health_check():
+    response = client.get("/health")
+    assert response.status_code == 200
+    assert response.json()["status"] == "healthy"
+
+
+def test_request_id_is_echoed():
+    response = client.get("/health", headers={REQUEST_ID_HEADER: "client-id.42"})
+    assert response.headers[REQUEST_ID_HEADER] == "client-id.42"
+
+
+def test_request_id_is_generated_when_missing():
+    first = client.get("/health").headers[REQUEST_ID_HEADER]
+    second = client.get("/health").headers[REQUEST_ID_HEADER]
+    assert len(first) == 32
+    assert first != second
+
+
+@pytest.mark.parametrize("value", ["has spaces", "x" * 200, "<script>"])
+def test_invalid_request_id_is_replaced(value):
+    response = client.get("/health", headers={REQUEST_ID_HEADER: value})
+    assert response.headers[REQUEST_ID_HEADER] != value
+    assert len(response.headers[REQUEST_ID_HEADER]) == 32
+
+
+def test_profile_disabled_without_admin_token(monkeypatch):
+    monkeypatch.setattr(settings, "admin_token", "")
+    response = client.post("/admin/profile", headers={"X-Admin-Token": "anything"})
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize("headers", [
+    {},
+    {"X-Admin-Token": "wrong-token"},
+    {"X-Admin-Token": "caf\xe9".encode("latin-1")},
+])
+def test_profile_rejects_bad_token(admin_token, headers):
+    response = client.post("/admin/profile", headers=headers)
+    assert response.status_code == 403
+
+
+@pytest.mark.parametrize("seconds", [0, -1, 10_000])
+def test_profile_rejects_out_of_range_seconds(admin_token, seconds):
+    response = client.post(
+        "/admin/profile",
+        params={"seconds": seconds},
+        headers={"X-Admin-Token": admin_token}
+    )
+    assert response.status_code == 400
+
+
+def test_profile_conflict_while_running(admin_token):
+    profiler._lock.acquire()
+    try:
+        response = client.post(
+            "/admin/profile",
+            params={"seconds": 0.05},
+            headers={"X-Admin-Token": admin_token}
+        )
+    finally:
+        profiler._lock.release()
+    assert response.status_code == 409
+
+
+def test_profile_returns_folded_stacks(admin_token):
+    response = client.post(
+        "/admin/profile",
+        params={"seconds": 0.05},
+        headers={"X-Admin-Token": admin_token}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    lines = response.text.strip().splitlines()
+    assert lines
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
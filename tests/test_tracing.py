@@ -0,0 +1,148 @@
+import asyncio
+import json
+
+import pytest
+
+from app.config import settings
+from app.utils.tracing import (
+    SPAN_KIND_SERVER,
+    current_trace,
+    export_trace,
+    flush_exports,
+    span,
+    start_trace,
+    valid_request_id,
+)
+
+
+def _spans_by_name(trace):
+    return {s.name: s for s in trace.spans}
+
+
+def test_span_outside_trace_is_noop():
+    with span("orphan") as s:
+        assert s is None
+    assert current_trace() is None
+
+
+def test_spans_nest_under_current_span(monkeypatch):
+    monkeypatch.setattr(settings, "trace_export_path", "")
+    with start_trace("req-1") as trace:
+        assert current_trace() is trace
+        with span("outer"):
+            with span("inner", size=3):
+                pass
+        with span("sibling"):
+            pass
+
+    assert current_trace() is None
+    spans = _spans_by_name(trace)
+    assert trace.request_id == "req-1"
+    assert spans["outer"].parent_id is None
+    assert spans["inner"].parent_id == spans["outer"].span_id
+    assert spans["inner"].attributes == {"size": 3}
+    assert spans["sibling"].parent_id is None
+    assert all(s.end_ns >= s.start_ns and s.duration_ms >= 0 for s in trace.spans)
+
+
+@pytest.mark.asyncio
+async def test_spans_propagate_into_gather_children(monkeypatch):
+    monkeypatch.setattr(settings, "trace_export_path", "")
+
+    async def child(n):
+        with span(f"child-{n}"):
+            await asyncio.sleep(0.01)
+            with span(f"grandchild-{n}"):
+                pass
+
+    with start_trace() as trace:
+        with span("parent"):
+            await asyncio.gather(child(1), child(2))
+
+    spans = _spans_by_name(trace)
+    for n in (1, 2):
+        assert spans[f"child-{n}"].parent_id == spans["parent"].span_id
+        assert spans[f"grandchild-{n}"].parent_id == spans[f"child-{n}"].span_id
+
+
+def test_failing_span_records_error_and_reraises(monkeypatch):
+    monkeypatch.setattr(settings, "trace_export_path", "")
+    with start_trace() as trace:
+        with pytest.raises(ValueError, match="boom"):
+            with span("failing"):
+                raise ValueError("boom")
+
+    failing = _spans_by_name(trace)["failing"]
+    assert failing.error == "ValueError: boom"
+    assert failing.end_ns is not None
+
+
+def test_export_json_layout(monkeypatch, tmp_path):
+    path = tmp_path / "traces.jsonl"
+    monkeypatch.setattr(settings, "trace_export_path", str(path))
+    monkeypatch.setattr(settings, "trace_export_format", "json")
+
+    with start_trace("req-json") as trace:
+        with span("work", chars=10):
+            pass
+    flush_exports()
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 1
+    payload = json.loads(lines[0])
+    assert payload["trace_id"] == trace.trace_id
+    assert payload["request_id"] == "req-json"
+    assert payload["spans"][0]["name"] == "work"
+    assert payload["spans"][0]["attributes"] == {"chars": 10}
+
+
+def test_export_otlp_layout(monkeypatch, tmp_path):
+    path = tmp_path / "traces.jsonl"
+    monkeypatch.setattr(settings, "trace_export_path", str(path))
+    monkeypatch.setattr(settings, "trace_export_format", "otlp")
+
+    with start_trace("req-otlp") as trace:
+        with span("root", kind=SPAN_KIND_SERVER, status_code=200, ratio=0.5, cached=True):
+            with span("child"):
+                pass
+    flush_exports()
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 1
+    otlp_spans = json.loads(lines[0])["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    root, child = otlp_spans
+    assert root["traceId"] == child["traceId"] == trace.trace_id
+    assert root["kind"] == 2
+    assert child["kind"] == 1
+    assert child["parentSpanId"] == root["spanId"]
+    assert "parentSpanId" not in root
+
+    attributes = {a["key"]: a["value"] for a in root["attributes"]}
+    assert attributes["request.id"] == {"stringValue": "req-otlp"}
+    assert attributes["status_code"] == {"intValue": "200"}
+    assert attributes["ratio"] == {"doubleValue": 0.5}
+    assert attributes["cached"] == {"boolValue": True}
+
+
+def test_export_disabled_without_path(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "trace_export_path", "")
+    with start_trace() as trace:
+        with span("work"):
+            pass
+    export_trace(trace)
+    flush_exports()
+
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("abc-123_x.y", "abc-123_x.y"),
+    ("a" * 128, "a" * 128),
+    ("a" * 129, None),
+    ("bad id", None),
+    ("caf\xe9", None),
+    ("", None),
+    (None, None),
+])
+def test_valid_request_id(value, expected):
+    assert valid_request_id(value) == expected